@@ -0,0 +1,47 @@
+"""
+Measure how long a fresh interpreter takes to import the File Management System.
+
+Short-lived worker processes pay this cost on every start, so keep it small. Each run imports
+the module in a new process; the script reports the median and fails if it exceeds --max-ms.
+
+Usage: python benchmarks/bench_import.py [--runs 20] [--module src.FileManagementSystem] [--max-ms 80]
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def time_import(module, runs):
+    """Return the wall-clock milliseconds of importing module in each of runs fresh interpreters, minus interpreter startup."""
+    def run(code):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], cwd=PROJECT_ROOT, check=True)
+        return (time.perf_counter() - start) * 1000
+
+    baseline = statistics.median(run('pass') for _ in range(runs))
+    return [run(f'import {module}') - baseline for _ in range(runs)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--module', default='src.FileManagementSystem')
+    parser.add_argument('--max-ms', type=float, help='exit with status 1 if the median import time is above this')
+    arguments = parser.parse_args()
+
+    timings = time_import(arguments.module, arguments.runs)
+    median = statistics.median(timings)
+    print(f'{arguments.module}: median {median:.1f} ms, min {min(timings):.1f} ms, max {max(timings):.1f} ms '
+          f'over {arguments.runs} runs (interpreter startup excluded)')
+    if arguments.max_ms is not None and median > arguments.max_ms:
+        print(f'Import time regression: {median:.1f} ms > {arguments.max_ms:.1f} ms')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
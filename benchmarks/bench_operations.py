@@ -0,0 +1,240 @@
+"""
+Time FileManager operations on synthetic directory trees of realistic sizes.
+
+For each scale a working directory is generated with a flat directory of that many files,
+for list_files, create_file, delete_file and list_directories, and a tree of that many
+entries in directories of 100, for copy_directory and recursive list_directories. Files are
+mostly tiny (0-4 KiB) with one medium file (1 MiB) in every thousand. copy_file is timed
+separately for a tiny, a medium (16 MiB) and a multi-GB sparse file.
+
+Results can be saved as a baseline and later runs compared against it; an operation more than
+--tolerance slower than its baseline is flagged as a regression and makes the script exit with 1.
+
+Usage:
+    python benchmarks/bench_operations.py --scales 1k,100k --save baseline.json
+    python benchmarks/bench_operations.py --scales 1k,100k --compare baseline.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import statistics
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.FileManagementSystem import FileManager  # noqa: E402
+
+SCALES = {'1k': 1000, '10k': 10000, '100k': 100000, '1M': 1000000}
+FILES_PER_DIRECTORY = 100
+TINY_MAX_SIZE = 4096
+MEDIUM_SIZE = 1024 ** 2
+MEDIUM_EVERY = 1000
+COPY_SIZES = {'tiny': 1024, 'medium': 16 * 1024 ** 2}
+# Operations timed per call over a batch rather than once per repeat
+BATCH_SIZE = 100
+
+
+def write_file(path, size, block):
+    with open(path, 'wb') as file:
+        file.write(block[:size])
+
+
+def generate(root, entries, seed=0):
+    """Create root/flat and root/tree with entries files each. Skipped if root was already generated."""
+    marker = os.path.join(root, '.complete')
+    if os.path.exists(marker):
+        return
+    rng = random.Random(seed)
+    block = os.urandom(MEDIUM_SIZE)
+
+    def size(number):
+        return MEDIUM_SIZE if number % MEDIUM_EVERY == MEDIUM_EVERY - 1 else rng.randint(0, TINY_MAX_SIZE)
+
+    flat = os.path.join(root, 'flat')
+    os.makedirs(flat, exist_ok=True)
+    for number in range(entries):
+        write_file(os.path.join(flat, f'file{number:07d}.dat'), size(number), block)
+    tree = os.path.join(root, 'tree')
+    for number in range(entries):
+        directory = os.path.join(tree, f'dir{number // FILES_PER_DIRECTORY:05d}')
+        if number % FILES_PER_DIRECTORY == 0:
+            os.makedirs(directory, exist_ok=True)
+        write_file(os.path.join(directory, f'file{number:07d}.dat'), size(number), block)
+    with open(marker, 'w'):
+        pass
+
+
+def generate_copy_sources(root, sparse_size):
+    """Create one file per copy size class in root/sources and return {class: name}."""
+    sources = os.path.join(root, 'sources')
+    os.makedirs(sources, exist_ok=True)
+    names = {}
+    for label, size in COPY_SIZES.items():
+        names[label] = f'{label}.dat'
+        path = os.path.join(sources, names[label])
+        if not os.path.exists(path) or os.path.getsize(path) != size:
+            write_file(path, size, os.urandom(size))
+    names['sparse'] = 'sparse.img'
+    path = os.path.join(sources, names['sparse'])
+    if not os.path.exists(path) or os.path.getsize(path) != sparse_size:
+        with open(path, 'wb') as file:
+            # Data at the start, middle and end with holes in between, like a VM image
+            for offset in (0, sparse_size // 2, sparse_size - MEDIUM_SIZE):
+                file.seek(offset)
+                file.write(os.urandom(MEDIUM_SIZE))
+    return names
+
+
+def check(result, expect):
+    """
+    Raise if an operation failed. FileManager reports failures as returned messages rather than
+    exceptions, so a result, or each result of a batch, must contain expect. Without expect the
+    operation returns a listing, and any message means it failed.
+    """
+    if expect is None:
+        if isinstance(result, str):
+            raise RuntimeError(f'Operation failed: {result}')
+        return
+    for message in result if isinstance(result, list) else [result]:
+        if not isinstance(message, str) or expect not in message:
+            raise RuntimeError(f'Operation failed: {message}')
+
+
+def timed(call, before=None, after=None, repeat=5, expect=None):
+    """
+    Return the median seconds of repeat calls, running before and after each one untimed.
+    Each result is checked with check, so a failing operation is not reported as fast.
+    """
+    timings = []
+    for _ in range(repeat):
+        if before:
+            before()
+        start = time.perf_counter()
+        result = call()
+        timings.append(time.perf_counter() - start)
+        check(result, expect)
+        if after:
+            after()
+    return statistics.median(timings)
+
+
+def file_manager_at(path):
+    """Return a FileManager working in path. Like the CLI, it works on the current directory."""
+    os.chdir(path)
+    return FileManager()
+
+
+def bench_scale(root, repeat):
+    """Time each operation in a generated scale directory. Return {operation: seconds}."""
+    flat, tree = os.path.join(root, 'flat'), os.path.join(root, 'tree')
+    results = {}
+    fm = file_manager_at(flat)
+
+    results['list_files (cold)'] = timed(lambda: file_manager_at(flat).list_files(), repeat=repeat)
+    results['list_files (warm)'] = timed(fm.list_files, repeat=repeat)
+    results['list_directories'] = timed(fm.list_directories, repeat=repeat)
+
+    names = [f'new{number}.txt' for number in range(BATCH_SIZE)]
+    def remove_names():
+        for name in names:
+            os.remove(os.path.join(flat, name))
+        fm.refresh_files()
+    results['create_file'] = timed(lambda: [fm.create_file(name) for name in names],
+                                   after=remove_names, repeat=repeat, expect='created successfully') / BATCH_SIZE
+
+    def create_names():
+        for name in names:
+            open(os.path.join(flat, name), 'x').close()
+        fm.refresh_files()
+    results['delete_file'] = timed(lambda: [fm.delete_file(name) for name in names],
+                                   before=create_names, repeat=repeat, expect='deleted successfully') / BATCH_SIZE
+
+    parent = file_manager_at(root)
+    results['copy_directory'] = timed(lambda: parent.copy_directory('tree', tree),
+                                      after=lambda: shutil.rmtree(os.path.join(root, 'tree_copy1')),
+                                      repeat=max(1, repeat // 2), expect='copied successfully')
+    results['copy_directory (8 workers)'] = timed(lambda: parent.copy_directory('tree', tree, workers=8),
+                                                  after=lambda: shutil.rmtree(os.path.join(root, 'tree_copy1')),
+                                                  repeat=max(1, repeat // 2), expect='copied successfully')
+    results['list_directories (recursive)'] = timed(lambda: parent.list_directories(recursive=True), repeat=repeat)
+    return results
+
+
+def bench_copy_file(root, sparse_size, repeat):
+    """Time copy_file for each size class into an empty directory. Return {operation: seconds}."""
+    sources = os.path.join(root, 'sources')
+    destination = os.path.join(root, 'destination')
+    os.makedirs(destination, exist_ok=True)
+    names = generate_copy_sources(root, sparse_size)
+    fm = file_manager_at(sources)
+    results = {}
+    for label, name in names.items():
+        results[f'copy_file ({label})'] = timed(lambda: fm.copy_file(name, destination + os.sep),
+                                                after=lambda: os.remove(os.path.join(destination, name)),
+                                                repeat=repeat, expect='copied successfully')
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Print each result against its baseline and return the names of the regressions."""
+    regressions = []
+    for name, seconds in results.items():
+        before = baseline.get(name)
+        if before is None:
+            print(f'{name:45} {seconds * 1000:12.3f} ms   (no baseline)')
+            continue
+        ratio = seconds / before if before else float('inf')
+        flag = 'REGRESSION' if ratio > 1 + tolerance else 'improved' if ratio < 1 - tolerance else ''
+        print(f'{name:45} {seconds * 1000:12.3f} ms   {before * 1000:12.3f} ms   {ratio:5.2f}x {flag}')
+        if flag == 'REGRESSION':
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scales', default='1k', help=f"comma-separated scales out of {', '.join(SCALES)} (default 1k)")
+    parser.add_argument('--repeat', type=int, default=5, help='runs per operation; the median is reported')
+    parser.add_argument('--sparse-gib', type=float, default=4, help='apparent size of the sparse copy_file source')
+    parser.add_argument('--workdir', help='generate the trees here and keep them for later runs instead of a temporary directory')
+    parser.add_argument('--save', metavar='FILE', help='store the results as a baseline')
+    parser.add_argument('--compare', metavar='FILE', help='compare the results with a stored baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='slowdown ratio flagged as a regression (default 0.25)')
+    arguments = parser.parse_args()
+
+    workdir = os.path.abspath(arguments.workdir or tempfile.mkdtemp(prefix='fms-bench-'))
+    cwd = os.getcwd()
+    results = {}
+    try:
+        for scale in arguments.scales.split(','):
+            root = os.path.join(workdir, scale)
+            start = time.perf_counter()
+            generate(root, SCALES[scale])
+            print(f'{scale}: tree ready in {time.perf_counter() - start:.1f}s', file=sys.stderr)
+            results.update((f'{scale} {name}', seconds) for name, seconds in bench_scale(root, arguments.repeat).items())
+        results.update(bench_copy_file(workdir, int(arguments.sparse_gib * 1024 ** 3), arguments.repeat))
+    finally:
+        os.chdir(cwd)
+        if not arguments.workdir:
+            shutil.rmtree(workdir)
+
+    baseline = {}
+    if arguments.compare:
+        with open(arguments.compare) as file:
+            baseline = json.load(file)['results']
+    regressions = compare(results, baseline, arguments.tolerance)
+    if arguments.save:
+        with open(arguments.save, 'w') as file:
+            json.dump({'python': platform.python_version(), 'platform': platform.platform(), 'time': time.time(),
+                       'results': results}, file, indent=2)
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+import os
+import weakref
+import asyncio
+import functools
+import threading
+import contextlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from src.FileManagementSystem import FileManager
+
+# Paths whose device is remembered; the least recently used are forgotten beyond this
+DEVICE_CACHE_SIZE = 4096
+
+
+def resolve_device(path):
+    """Return the device holding path, or its closest existing parent, or None if none can be stat'ed."""
+    probe = os.path.abspath(path)
+    while True:
+        try:
+            return os.stat(probe).st_dev
+        except OSError:
+            parent = os.path.dirname(probe)
+            if parent == probe:
+                return None
+            probe = parent
+
+
+class AsyncFileManager:
+    """
+    Asyncio facade over a FileManager.
+    Every operation runs on a bounded thread pool so the event loop never blocks on a syscall,
+    and at most per_device operations touch the same filesystem device at once. Copies into the
+    same directory are serialized so that their _copyN names cannot collide, while copies to
+    different directories overlap. Cancelling a copy task stops the copy between chunks and
+    removes the partial destination; cancelling a move stops it between files, and moving the
+    same source again resumes it. Devices are looked up on the thread pool as well.
+    """
+    def __init__(self, file_manager=None, max_workers=32, per_device=8):
+        self.file_manager = file_manager or FileManager()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='fms-io')
+        self.per_device = per_device
+        # Least recently used first, bounded by DEVICE_CACHE_SIZE
+        self.devices = OrderedDict()
+        self.semaphores = {}
+        # A lock only lives while some copy into its directory holds or awaits it
+        self.directory_locks = weakref.WeakValueDictionary()
+
+    async def close(self):
+        """Wait for running operations to finish and release the worker threads."""
+        await asyncio.get_running_loop().run_in_executor(None, self.executor.shutdown)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def _device(self, path):
+        """Return the device holding path, stat'ing it on the executor. Results are cached per path."""
+        if path in self.devices:
+            self.devices.move_to_end(path)
+            return self.devices[path]
+        device = await asyncio.get_running_loop().run_in_executor(self.executor, resolve_device, path)
+        self.devices[path] = device
+        if len(self.devices) > DEVICE_CACHE_SIZE:
+            self.devices.popitem(last=False)
+        return device
+
+    def _directory_lock(self, new_path):
+        """Return the lock serializing copies into the directory that new_path resolves to."""
+        directory = os.path.abspath(os.path.split(new_path)[0] or self.file_manager.path)
+        lock = self.directory_locks.get(directory)
+        if lock is None:
+            lock = self.directory_locks[directory] = asyncio.Lock()
+        return lock
+
+    async def _run(self, paths, call, cancel=None):
+        """
+        Run call on the executor while holding a slot on every device in paths.
+        Slots are taken in device order so that two operations can never wait on each other.
+        If the awaiting task is cancelled, the cancel event is set and the slots are held until
+        the worker thread has actually stopped.
+        """
+        devices = sorted({await self._device(path) for path in paths}, key=str)
+        async with contextlib.AsyncExitStack() as stack:
+            for device in devices:
+                await stack.enter_async_context(self.semaphores.setdefault(device, asyncio.Semaphore(self.per_device)))
+            future = self.executor.submit(call)
+            try:
+                return await asyncio.wrap_future(future)
+            except asyncio.CancelledError:
+                if not future.cancel():
+                    if cancel is not None:
+                        cancel.set()
+                    await asyncio.wait({asyncio.wrap_future(future)})
+                raise
+
+    async def list_files(self, verbose=False):
+        return await self._run([self.file_manager.path], functools.partial(self.file_manager.list_files, verbose))
+
+    async def list_directories(self, recursive=False, max_depth=None):
+        return await self._run([self.file_manager.path], functools.partial(
+            self.file_manager.list_directories, recursive, max_depth))
+
+    async def create_file(self, file_name, verbose=False):
+        return await self._run([self.file_manager.path], functools.partial(
+            self.file_manager.create_file, file_name, verbose=verbose))
+
+    async def delete_file(self, file_name, verbose=False):
+        return await self._run([self.file_manager.path], functools.partial(
+            self.file_manager.delete_file, file_name, verbose=verbose))
+
+    async def rename_file(self, old_name, new_name, verbose=False):
+        return await self._run([self.file_manager.path], functools.partial(
+            self.file_manager.rename_file, old_name, new_name, verbose=verbose))
+
+    async def move_file(self, file_name, new_path, verbose=False):
+        cancel = threading.Event()
+        return await self._run([self.file_manager.path, new_path], functools.partial(
+            self.file_manager.move_file, file_name, new_path, verbose=verbose, cancel=cancel), cancel)
+
+    async def copy_file(self, file_name, new_path, max_copies=10, verbose=False):
+        cancel = threading.Event()
+        async with self._directory_lock(new_path):
+            return await self._run([self.file_manager.path, new_path], functools.partial(
+                self.file_manager.copy_file, file_name, new_path, max_copies, verbose, cancel=cancel), cancel)
+
+    async def create_directory(self, directory_name, verbose=False):
+        return await self._run([self.file_manager.path], functools.partial(
+            self.file_manager.create_directory, directory_name, verbose=verbose))
+
+    async def delete_directory(self, directory_name, verbose=False):
+        return await self._run([self.file_manager.path], functools.partial(
+            self.file_manager.delete_directory, directory_name, verbose=verbose))
+
+    async def rename_directory(self, old_name, new_name, verbose=False):
+        return await self._run([self.file_manager.path], functools.partial(
+            self.file_manager.rename_directory, old_name, new_name, verbose=verbose))
+
+    async def move_directory(self, directory_name, new_path, verbose=False):
+        cancel = threading.Event()
+        return await self._run([self.file_manager.path, new_path], functools.partial(
+            self.file_manager.move_directory, directory_name, new_path, verbose=verbose, cancel=cancel), cancel)
+
+    async def copy_directory(self, directory_name, new_path, max_copies=10, verbose=False, workers=None, progress=None):
+        cancel = threading.Event()
+        async with self._directory_lock(new_path):
+            return await self._run([self.file_manager.path, new_path], functools.partial(
+                self.file_manager.copy_directory, directory_name, new_path, max_copies, verbose,
+                workers=workers, progress=progress, cancel=cancel), cancel)
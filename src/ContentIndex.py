@@ -0,0 +1,160 @@
+import os
+import re
+import math
+import heapq
+import sqlite3
+from collections import namedtuple, Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from src.FileManagementSystem import exception_handler, read_chunks, walk_tree, READ_CHUNK_SIZE
+
+# Default name of the index database, created in the indexed root and left out of the index itself
+CONTENT_INDEX_FILE_NAME = '.fms_content.sqlite3'
+# Words are runs of letters, digits and underscores; longer runs (hashes, encoded blobs) are not indexed
+TOKEN_PATTERN = re.compile(r'\w+')
+MAX_TOKEN_LENGTH = 64
+# BM25 ranking parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    length INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT NOT NULL,
+    document INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (term, document)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_document ON postings (document);
+'''
+
+# A ranked search hit, and the work done by ContentIndex.refresh
+SearchResult = namedtuple('SearchResult', ['path', 'score'])
+ContentRefreshStats = namedtuple('ContentRefreshStats', ['files_indexed', 'files_skipped', 'files_removed'])
+
+
+def tokenize_file(task):
+    """
+    Count the words in a text file, reading it in chunks so it is never loaded whole.
+    Return (path, counts, number of words), with counts None for binary or unreadable files.
+    """
+    path, chunk_size = task
+    counts = Counter()
+    carry = ''
+    try:
+        for number, chunk in enumerate(read_chunks(open(path, 'r', encoding='utf-8', errors='replace'), chunk_size)):
+            if number == 0 and '\x00' in chunk:
+                return path, None, 0
+            chunk = (carry + chunk).lower()
+            tokens = TOKEN_PATTERN.findall(chunk)
+            # A word running up to the end of the chunk may continue in the next one
+            carry = tokens.pop()[:MAX_TOKEN_LENGTH + 1] if tokens and TOKEN_PATTERN.match(chunk[-1]) else ''
+            counts.update(token for token in tokens if len(token) <= MAX_TOKEN_LENGTH)
+    except OSError:
+        return path, None, 0
+    if carry and len(carry) <= MAX_TOKEN_LENGTH:
+        counts[carry] += 1
+    return path, counts, sum(counts.values())
+
+
+class ContentIndex:
+    """
+    Inverted full-text index over the text files below a root directory, stored in SQLite.
+    Each refresh only re-tokenizes files whose size or mtime changed, spreading the work over a
+    process pool, and search ranks the matching files with BM25.
+    """
+    def __init__(self, root, database=None, include=None, exclude=None):
+        self.root = os.path.abspath(root)
+        self.database = database or os.path.join(self.root, CONTENT_INDEX_FILE_NAME)
+        self.include = include
+        self.exclude = exclude
+        self.connection = sqlite3.connect(self.database)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @exception_handler
+    def refresh(self, workers=None):
+        """Index new and changed files, forget deleted ones, and return a ContentRefreshStats. workers=1 tokenizes in this process."""
+        known = {path: (document, size, mtime_ns) for document, path, size, mtime_ns in self.connection.execute(
+            'SELECT id, path, size, mtime_ns FROM documents')}
+        changed = []
+        skipped = 0
+        for entry in walk_tree(self.root, include=self.include, exclude=self.exclude):
+            if not entry.is_file(follow_symlinks=False) or entry.name.startswith(CONTENT_INDEX_FILE_NAME):
+                continue
+            stat = entry.stat(follow_symlinks=False)
+            previous = known.pop(entry.path, None)
+            if previous and previous[1:] == (stat.st_size, stat.st_mtime_ns):
+                skipped += 1
+                continue
+            changed.append((entry.path, stat.st_size, stat.st_mtime_ns, previous[0] if previous else None))
+
+        tasks = [(path, READ_CHUNK_SIZE) for path, _, _, _ in changed]
+        with self.connection:
+            for document, _, _ in known.values():
+                self._remove(document)
+            if workers == 1:
+                self._store(changed, map(tokenize_file, tasks))
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    self._store(changed, pool.map(tokenize_file, tasks, chunksize=16))
+        return ContentRefreshStats(len(changed), skipped, len(known))
+
+    def _store(self, changed, tokenized):
+        """Write the postings of freshly tokenized files, replacing any previous version."""
+        for (path, size, mtime_ns, document), (_, counts, length) in zip(changed, tokenized):
+            if document is None:
+                document = self.connection.execute(
+                    'INSERT INTO documents (path, size, mtime_ns, length) VALUES (?, ?, ?, ?)',
+                    (path, size, mtime_ns, length)).lastrowid
+            else:
+                self.connection.execute('DELETE FROM postings WHERE document = ?', (document,))
+                self.connection.execute(
+                    'UPDATE documents SET size = ?, mtime_ns = ?, length = ? WHERE id = ?', (size, mtime_ns, length, document))
+            # Binary files are recorded without postings so they are not re-read until they change
+            if counts:
+                self.connection.executemany(
+                    'INSERT INTO postings VALUES (?, ?, ?)', ((term, document, count) for term, count in counts.items()))
+
+    def _remove(self, document):
+        self.connection.execute('DELETE FROM postings WHERE document = ?', (document,))
+        self.connection.execute('DELETE FROM documents WHERE id = ?', (document,))
+
+    @exception_handler
+    def search(self, query, limit=10):
+        """Return up to limit SearchResults for the files that mention any word of query, best match first."""
+        terms = set(TOKEN_PATTERN.findall(query.lower()))
+        total, average = self.connection.execute('SELECT COUNT(*), AVG(length) FROM documents').fetchone()
+        if not terms or not total or not average:
+            return []
+        scores = Counter()
+        for term in terms:
+            postings = self.connection.execute(
+                'SELECT p.document, p.count, d.length FROM postings p JOIN documents d ON d.id = p.document WHERE p.term = ?',
+                (term,)).fetchall()
+            if not postings:
+                continue
+            idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for document, count, length in postings:
+                scores[document] += idf * count * (BM25_K1 + 1) / (count + BM25_K1 * (1 - BM25_B + BM25_B * length / average))
+        results = []
+        for document, score in heapq.nlargest(limit, scores.items(), key=lambda item: item[1]):
+            path = self.connection.execute('SELECT path FROM documents WHERE id = ?', (document,)).fetchone()[0]
+            results.append(SearchResult(path, score))
+        return results
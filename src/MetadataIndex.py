@@ -0,0 +1,164 @@
+import os
+import sqlite3
+from collections import namedtuple
+
+from src.FileManagementSystem import exception_handler, hash_file_content, READ_CHUNK_SIZE
+
+# Default name of the index database, created in the indexed root and left out of the index itself
+INDEX_FILE_NAME = '.fms_index.sqlite3'
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS entries (
+    path TEXT PRIMARY KEY,
+    parent TEXT NOT NULL,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    hash TEXT
+);
+CREATE INDEX IF NOT EXISTS entries_parent ON entries (parent);
+CREATE INDEX IF NOT EXISTS entries_name ON entries (name);
+CREATE INDEX IF NOT EXISTS entries_size ON entries (size);
+CREATE INDEX IF NOT EXISTS entries_mtime ON entries (mtime_ns);
+CREATE TABLE IF NOT EXISTS directories (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL
+);
+'''
+
+# A file, directory or symlink recorded in the index; mtime is in seconds since the epoch
+IndexedEntry = namedtuple('IndexedEntry', ['path', 'type', 'size', 'mtime', 'hash'])
+# Work done by MetadataIndex.refresh
+RefreshStats = namedtuple('RefreshStats', ['directories_scanned', 'directories_skipped', 'entries_updated', 'entries_removed'])
+
+
+def subtree_bounds(path):
+    """Return the (low, high) key range covering every path strictly below path, for an index range scan."""
+    return path + os.sep, path + chr(ord(os.sep) + 1)
+
+
+class MetadataIndex:
+    """
+    Persistent index of file metadata below a root directory, stored in SQLite.
+    Each refresh only re-lists directories whose modification time changed since the last one.
+    A file modified in place does not change its directory's mtime, so use refresh(full=True)
+    to pick up content changes in otherwise untouched directories. The database defaults to a
+    file in root; keeping it elsewhere avoids rescanning root itself, whose mtime changes
+    whenever SQLite creates or removes its journal files.
+    """
+    def __init__(self, root, database=None):
+        self.root = os.path.abspath(root)
+        self.database = database or os.path.join(self.root, INDEX_FILE_NAME)
+        self.connection = sqlite3.connect(self.database)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @exception_handler
+    def refresh(self, full=False, compute_hash=False):
+        """
+        Bring the index up to date with the filesystem in a single transaction.
+        Unchanged directories are skipped and their subdirectories are taken from the index.
+        With compute_hash, new and changed files get a content hash. Return a RefreshStats.
+        """
+        stats = {'scanned': 0, 'skipped': 0, 'updated': 0, 'removed': 0}
+        with self.connection:
+            pending = [self.root]
+            while pending:
+                directory = pending.pop()
+                try:
+                    mtime = os.stat(directory).st_mtime_ns
+                except OSError:
+                    stats['removed'] += self._remove(directory)
+                    continue
+                stored = self.connection.execute('SELECT mtime_ns FROM directories WHERE path = ?', (directory,)).fetchone()
+                if not full and stored and stored[0] == mtime:
+                    stats['skipped'] += 1
+                    pending.extend(row[0] for row in self.connection.execute(
+                        "SELECT path FROM entries WHERE parent = ? AND type = 'dir'", (directory,)))
+                    continue
+                stats['scanned'] += 1
+                self._scan(directory, mtime, compute_hash, pending, stats)
+        return RefreshStats(stats['scanned'], stats['skipped'], stats['updated'], stats['removed'])
+
+    def _scan(self, directory, mtime, compute_hash, pending, stats):
+        """Re-list one directory, upserting changed entries and removing vanished ones."""
+        known = {name: (kind, size, mtime_ns) for name, kind, size, mtime_ns in self.connection.execute(
+            'SELECT name, type, size, mtime_ns FROM entries WHERE parent = ?', (directory,))}
+        rows = []
+        try:
+            scanner = os.scandir(directory)
+        except OSError:
+            # Skipped like walk_tree does: its rows are kept and, without a recorded mtime, it is retried next time
+            pending.extend(os.path.join(directory, name) for name, (kind, _, _) in known.items() if kind == 'dir')
+            return
+        with scanner:
+            for entry in scanner:
+                if directory == self.root and entry.name.startswith(INDEX_FILE_NAME):
+                    continue
+                try:
+                    stat = entry.stat(follow_symlinks=False)
+                    kind = 'link' if entry.is_symlink() else 'dir' if entry.is_dir(follow_symlinks=False) else 'file'
+                except OSError:
+                    continue  # Vanished while we were listing; the entry is removed below
+                if kind == 'dir':
+                    pending.append(entry.path)
+                previous = known.pop(entry.name, None)
+                if previous == (kind, stat.st_size, stat.st_mtime_ns):
+                    continue
+                if previous and previous[0] == 'dir' and kind != 'dir':
+                    stats['removed'] += self._remove(entry.path, subtree_only=True)
+                digest = hash_file_content((entry.path, READ_CHUNK_SIZE))[1] if compute_hash and kind == 'file' else None
+                rows.append((entry.path, directory, entry.name, kind, stat.st_size, stat.st_mtime_ns, digest))
+        self.connection.executemany('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+        stats['updated'] += len(rows)
+        for name in known:
+            stats['removed'] += self._remove(os.path.join(directory, name))
+        self.connection.execute('INSERT OR REPLACE INTO directories VALUES (?, ?)', (directory, mtime))
+
+    def _remove(self, path, subtree_only=False):
+        """Remove path and everything recorded below it. Return the number of entries removed."""
+        low, high = subtree_bounds(path)
+        removed = self.connection.execute('DELETE FROM entries WHERE path >= ? AND path < ?', (low, high)).rowcount
+        self.connection.execute('DELETE FROM directories WHERE path >= ? AND path < ?', (low, high))
+        if not subtree_only:
+            removed += self.connection.execute('DELETE FROM entries WHERE path = ?', (path,)).rowcount
+            self.connection.execute('DELETE FROM directories WHERE path = ?', (path,))
+        return removed
+
+    def _query(self, condition, parameters, limit):
+        rows = self.connection.execute(
+            f'SELECT path, type, size, mtime_ns, hash FROM entries WHERE {condition} LIMIT ?', parameters + (limit,))
+        return [IndexedEntry(path, kind, size, mtime_ns / 1e9, digest) for path, kind, size, mtime_ns, digest in rows]
+
+    @exception_handler
+    def find_prefix(self, prefix, limit=-1):
+        """Return entries whose name starts with prefix."""
+        return self._query('name >= ? AND name < ?', (prefix, prefix + '\U0010ffff'), limit)
+
+    @exception_handler
+    def find_glob(self, pattern, limit=-1):
+        """Return entries whose name matches a case-sensitive glob pattern."""
+        return self._query('name GLOB ?', (pattern,), limit)
+
+    @exception_handler
+    def find_size(self, min_size=0, max_size=None, limit=-1):
+        """Return files whose size is between min_size and max_size bytes, inclusive."""
+        if max_size is None:
+            return self._query("type = 'file' AND size >= ?", (min_size,), limit)
+        return self._query("type = 'file' AND size BETWEEN ? AND ?", (min_size, max_size), limit)
+
+    @exception_handler
+    def modified_since(self, timestamp, limit=-1):
+        """Return entries modified at or after timestamp, in seconds since the epoch."""
+        return self._query('mtime_ns >= ?', (int(timestamp * 1e9),), limit)
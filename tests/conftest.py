@@ -0,0 +1,17 @@
+import os
+import pytest
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """
+    Create a small directory tree at tmp_path/project and return its path:
+    README.md, src/main.py, src/pkg/data.bin (4096 random bytes) and an empty directory.
+    """
+    root = tmp_path / 'project'
+    os.makedirs(root / 'src' / 'pkg')
+    os.makedirs(root / 'empty')
+    (root / 'README.md').write_text('readme')
+    (root / 'src' / 'main.py').write_text('print(1)\n')
+    (root / 'src' / 'pkg' / 'data.bin').write_bytes(os.urandom(4096))
+    return root
@@ -0,0 +1,60 @@
+import os
+from src.FileManagementSystem import FileManager
+
+
+def test_apply_batch_runs_valid_operations(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.mkdir(tmp_path / 'archive')
+    (tmp_path / 'old.txt').write_text('old')
+    fm = FileManager()
+
+    results = fm.apply_batch([
+        ('create', 'a.txt'),
+        ('rename', 'old.txt', 'new.txt'),
+        ('copy', 'new.txt', str(tmp_path / 'archive')),
+        ('move', 'a.txt', str(tmp_path / 'archive')),
+        ('delete', 'missing.txt'),
+        ('chmod', 'new.txt'),
+    ])
+
+    assert [result.success for result in results] == [True, True, True, True, False, False]
+    assert results[4].message == 'File does not exist.'
+    assert sorted(fm.files) == ['archive', 'new.txt']
+    assert sorted(os.listdir(tmp_path / 'archive')) == ['a.txt', 'new.txt']
+
+
+def test_apply_batch_validates_against_earlier_operations(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    fm = FileManager()
+
+    results = fm.apply_batch([('create', 'a.txt'), ('create', 'a.txt'), ('delete', 'a.txt')])
+
+    assert [result.success for result in results] == [True, False, True]
+    assert results[1].message == 'File already exists.'
+    assert fm.files == []
+
+
+def test_apply_batch_atomic_rejects_everything(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    fm = FileManager()
+
+    results = fm.apply_batch([('create', 'a.txt'), ('delete', 'missing.txt')], atomic=True)
+
+    assert not any(result.success for result in results)
+    assert os.listdir(tmp_path) == []
+
+
+def test_apply_batch_picks_up_external_changes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    fm = FileManager()
+    run = fm._run_batch_operation
+
+    def run_while_another_process_writes(kind, args, max_copies):
+        (tmp_path / 'external.txt').write_text('')
+        return run(kind, args, max_copies)
+    monkeypatch.setattr(fm, '_run_batch_operation', run_while_another_process_writes)
+
+    fm.apply_batch([('create', 'a.txt'), ('create', 'b.txt')])
+    fm.refresh_files()
+
+    assert sorted(fm.files) == ['a.txt', 'b.txt', 'external.txt']
@@ -0,0 +1,58 @@
+import io
+import os
+import gzip
+import tarfile
+import pytest
+from src.FileManagementSystem import FileManager, ParallelGzipWriter, extract_tree
+
+
+def test_parallel_gzip_writer_output_is_one_gzip_stream():
+    output = io.BytesIO()
+    data = os.urandom(2500) * 4
+    with ParallelGzipWriter(output, workers=2, chunk_size=1000) as compressed:
+        compressed.write(data[:3333])
+        compressed.write(data[3333:])
+
+    assert output.getvalue().count(b'\x1f\x8b\x08') >= 10
+    assert gzip.decompress(output.getvalue()) == data
+
+
+@pytest.mark.parametrize('format', ['tar', 'tar.gz', 'zip'])
+def test_archive_and_extract_round_trip(tmp_path, monkeypatch, tree, format):
+    monkeypatch.chdir(tmp_path)
+    fm = FileManager()
+
+    assert fm.archive_directory('project', f'project.{format}', format=format) == 'Directory archived successfully.'
+    assert fm.extract_archive(f'project.{format}', 'restored') == 'Archive extracted successfully.'
+
+    restored = tmp_path / 'restored' / 'project'
+    assert (restored / 'README.md').read_text() == 'readme'
+    assert (restored / 'src' / 'pkg' / 'data.bin').read_bytes() == (tree / 'src' / 'pkg' / 'data.bin').read_bytes()
+    assert (restored / 'empty').is_dir()
+    assert sorted(name for name in os.listdir(tmp_path) if name.startswith('project')) == ['project', f'project.{format}']
+
+
+def test_extract_rejects_members_outside_destination(tmp_path):
+    with tarfile.open(tmp_path / 'evil.tar', 'w') as archive:
+        member = tarfile.TarInfo('../evil.txt')
+        archive.addfile(member, io.BytesIO())
+
+    with pytest.raises(ValueError):
+        extract_tree(str(tmp_path / 'evil.tar'), str(tmp_path / 'out'))
+    assert not (tmp_path / 'evil.txt').exists()
+
+
+@pytest.mark.parametrize('format', ['tar', 'zip'])
+def test_archive_keeps_symlinks_as_links(tmp_path, monkeypatch, tree, format):
+    monkeypatch.chdir(tmp_path)
+    os.symlink('src', tree / 'linkdir')
+    os.symlink('README.md', tree / 'linkfile')
+    fm = FileManager()
+
+    assert fm.archive_directory('project', f'project.{format}', format=format) == 'Directory archived successfully.'
+    assert fm.extract_archive(f'project.{format}', 'restored') == 'Archive extracted successfully.'
+
+    restored = tmp_path / 'restored' / 'project'
+    assert os.readlink(restored / 'linkdir') == 'src'
+    assert os.readlink(restored / 'linkfile') == 'README.md'
+    assert (restored / 'linkdir' / 'main.py').read_text() == 'print(1)\n'
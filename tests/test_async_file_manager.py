@@ -0,0 +1,91 @@
+import asyncio
+import os
+import threading
+import pytest
+import src.AsyncFileManager as async_file_manager
+from src.AsyncFileManager import AsyncFileManager
+from src.FileManagementSystem import CopyCancelled, FileManager, fast_copy
+
+
+def test_concurrent_operations(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.mkdir(tmp_path / 'project')
+    (tmp_path / 'project' / 'source.txt').write_text('data')
+
+    async def scenario():
+        async with AsyncFileManager(FileManager(), max_workers=4, per_device=2) as afm:
+            created = await asyncio.gather(*(afm.create_file(f'file{n}.txt') for n in range(20)))
+            copies = await asyncio.gather(*(afm.copy_directory('project', str(tmp_path / 'project'), workers=2)
+                                            for _ in range(3)))
+            _, files = await afm.list_files()
+            return created, copies, list(files)
+
+    created, copies, files = asyncio.run(scenario())
+
+    assert all('created successfully' in result for result in created)
+    assert copies == ['Directory copied successfully.'] * 3
+    assert sorted(name for name in os.listdir(tmp_path) if name.startswith('project')) == [
+        'project', 'project_copy1', 'project_copy2', 'project_copy3']
+    assert len(files) == 24
+
+
+def test_cancelled_copy_removes_partial_file(tmp_path):
+    source, destination = tmp_path / 'big.bin', tmp_path / 'copy.bin'
+    source.write_bytes(os.urandom(1024 * 1024))
+    cancel = threading.Event()
+    cancel.set()
+
+    with pytest.raises(CopyCancelled):
+        fast_copy(str(source), str(destination), buffer_size=64 * 1024, cancel=cancel)
+    assert not destination.exists()
+
+
+def test_concurrent_creates_and_listings_keep_the_index_complete(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for number in range(3000):
+        (tmp_path / f'existing{number}.txt').write_text('')
+    fm = FileManager()
+
+    async def scenario():
+        async with AsyncFileManager(fm, max_workers=16, per_device=16) as afm:
+            calls = []
+            for number in range(2000):
+                calls.append(afm.create_file(f'new{number}.txt'))
+                if number % 4 == 0:
+                    # An external change forces the listing to rescan while creates are running
+                    os.utime(tmp_path, ns=(0, number))
+                    calls.append(afm.list_directories())
+            await asyncio.gather(*calls)
+
+    asyncio.run(scenario())
+    fm.refresh_files()
+
+    assert sorted(fm.files) == sorted(os.listdir(tmp_path))
+
+
+def test_devices_are_resolved_off_the_event_loop_and_cached_within_bounds(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(async_file_manager, 'DEVICE_CACHE_SIZE', 3)
+    threads = []
+    resolve_device = async_file_manager.resolve_device
+
+    def record_thread(path):
+        threads.append(threading.current_thread())
+        return resolve_device(path)
+    monkeypatch.setattr(async_file_manager, 'resolve_device', record_thread)
+    (tmp_path / 'source.txt').write_text('data')
+    for number in range(5):
+        os.mkdir(tmp_path / f'target{number}')
+
+    async def scenario():
+        async with AsyncFileManager(FileManager(), max_workers=2) as afm:
+            for number in range(5):
+                assert await afm.copy_file('source.txt', str(tmp_path / f'target{number}') + os.sep) == \
+                    'File copied successfully.'
+            return afm, threading.current_thread()
+
+    afm, loop_thread = asyncio.run(scenario())
+
+    assert threads and loop_thread not in threads
+    assert len(afm.devices) == 3
+    assert len(afm.directory_locks) == 0
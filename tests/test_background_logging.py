@@ -0,0 +1,40 @@
+import io
+import queue
+import logging
+from logging.handlers import QueueHandler, QueueListener
+from src.FileManagementSystem import LogBatcher
+
+
+class CountingHandler(logging.StreamHandler):
+    def __init__(self):
+        super().__init__(io.StringIO())
+        self.flush_count = 0
+
+    def flush(self):
+        self.flush_count += 1
+        super().flush()
+
+
+def test_log_batcher_suppresses_duplicates_and_flushes_per_burst():
+    records = queue.SimpleQueue()
+    target = CountingHandler()
+    batcher = LogBatcher(records, [target], interval=60)
+    logger = logging.getLogger('test_background_logging')
+    logger.propagate = False
+    logger.addHandler(QueueHandler(records))
+    for _ in range(500):
+        logger.error('Error: Permission denied.')
+    logger.error('Error: File or directory not found.')
+
+    listener = QueueListener(records, batcher)
+    listener.start()
+    listener.stop()
+    batcher.close()
+
+    assert target.stream.getvalue().splitlines() == [
+        'Error: Permission denied.',
+        'Error: File or directory not found.',
+        'Error: Permission denied. (suppressed 499 duplicates)',
+    ]
+    # One flush when the queued burst drained and one on close, rather than one per record
+    assert target.flush_count <= 3
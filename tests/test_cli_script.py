@@ -0,0 +1,30 @@
+import io
+import json
+from src.FileManagementSystem import CLI, FileManager
+
+
+def test_run_script_emits_json_lines(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    script = io.StringIO('\n'.join([
+        '# set up',
+        'create a.txt',
+        'create_dir "my dir"',
+        'rename a.txt b.txt',
+        'delete missing.txt',
+        'frobnicate a.txt',
+        'list',
+        'list_dirs',
+        'copy successfully.txt "my dir"',
+    ]))
+    output = io.StringIO()
+
+    failures = CLI(FileManager()).run_script(script, output)
+
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert failures == 3
+    assert [result['ok'] for result in results] == [True, True, True, False, False, True, True, False]
+    assert results[1]['args'] == ['my dir']
+    assert results[3]['result'] == 'File does not exist.'
+    assert sorted(results[5]['result']) == ['b.txt', 'my dir']
+    assert results[6] == {'line': 8, 'command': 'list_dirs', 'args': [], 'ok': True, 'result': ['my dir']}
+    assert results[7]['result'] == 'Error: The file successfully.txt does not exist.'
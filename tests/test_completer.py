@@ -0,0 +1,42 @@
+import os
+from src.FileManagementSystem import Completer, FileManager
+
+
+def completions(completer, text):
+    results = []
+    while True:
+        result = completer.complete(text, len(results))
+        if result is None:
+            return results
+        results.append(result)
+
+
+def test_completes_from_the_file_manager_index(tmp_path, monkeypatch, mocker):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs(tmp_path / 'reports' / 'annual')
+    (tmp_path / 'readme.txt').write_text('')
+    (tmp_path / 'notes.txt').write_text('')
+    (tmp_path / 'reports' / 'q1.csv').write_text('')
+    fm = FileManager()
+    completer = Completer(fm)
+
+    scandir = mocker.spy(os, 'scandir')
+    assert completions(completer, 're') == ['readme.txt', 'reports/']
+    assert completions(completer, 'x') == []
+    assert scandir.call_count == 0
+
+    # Names created through the FileManager show up without relisting the directory
+    fm.create_file('recent.txt')
+    assert completions(completer, 're') == ['readme.txt', 'recent.txt', 'reports/']
+    assert scandir.call_count == 0
+
+
+def test_completes_into_subdirectories(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs(tmp_path / 'reports' / 'annual')
+    (tmp_path / 'reports' / 'q1.csv').write_text('')
+    completer = Completer()
+
+    assert completions(completer, 'reports/') == ['reports/annual/', 'reports/q1.csv']
+    assert completions(completer, 'reports/q') == ['reports/q1.csv']
+    assert completions(completer, 'missing/') == []
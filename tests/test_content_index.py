@@ -0,0 +1,35 @@
+import os
+import pytest
+from src.ContentIndex import ContentIndex, tokenize_file
+
+
+def test_tokenize_file_streams_across_chunks(tmp_path):
+    path = tmp_path / 'notes.txt'
+    path.write_text('Alpha beta\nbeta GAMMA_1 ' + 'x' * 100)
+
+    _, counts, length = tokenize_file((str(path), 4))
+
+    assert counts == {'alpha': 1, 'beta': 2, 'gamma_1': 1}
+    assert length == 4
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_refresh_and_search(tmp_path, workers):
+    database = str(tmp_path / 'content.sqlite3')
+    share = tmp_path / 'share'
+    os.makedirs(share / 'docs')
+    (share / 'docs' / 'budget.txt').write_text('budget budget forecast for the quarter')
+    (share / 'docs' / 'minutes.md').write_text('meeting minutes, the budget was discussed')
+    (share / 'image.bin').write_bytes(b'\x00budget')
+
+    with ContentIndex(str(share), database) as index:
+        assert index.refresh(workers=workers) == (3, 0, 0)
+        results = index.search('budget')
+        assert [os.path.basename(result.path) for result in results] == ['budget.txt', 'minutes.md']
+        assert index.search('nothing here') == []
+
+        os.remove(share / 'docs' / 'minutes.md')
+        (share / 'docs' / 'budget.txt').write_text('revised forecast')
+        assert index.refresh(workers=workers) == (1, 1, 1)
+        assert index.search('budget') == []
+        assert [os.path.basename(result.path) for result in index.search('forecast')] == ['budget.txt']
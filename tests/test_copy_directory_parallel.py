@@ -0,0 +1,43 @@
+import os
+import shutil
+import pytest
+from src.FileManagementSystem import CopyProgress, FileManager, copy_tree_parallel
+
+
+def test_parallel_copy_directory_matches_source(tmp_path, monkeypatch, tree):
+    monkeypatch.chdir(tmp_path)
+    fm = FileManager()
+    updates = []
+
+    result = fm.copy_directory('project', str(tree), workers=4,
+                               progress=lambda progress: updates.append(progress.files_copied))
+
+    assert result == 'Directory copied successfully.'
+    copy = tmp_path / 'project_copy1'
+    assert (copy / 'src' / 'pkg' / 'data.bin').read_bytes() == (tree / 'src' / 'pkg' / 'data.bin').read_bytes()
+    assert (copy / 'src' / 'main.py').read_text() == 'print(1)\n'
+    assert (copy / 'empty').is_dir()
+    assert sorted(updates) == [1, 2, 3]
+    assert 'project_copy1' in fm.files
+
+
+def test_parallel_copy_reports_dangling_symlink_and_copies_the_rest(tmp_path, monkeypatch, tree):
+    monkeypatch.chdir(tmp_path)
+    os.symlink(tmp_path / 'missing', tree / 'src' / 'broken')
+    fm = FileManager()
+
+    result = fm.copy_directory('project', str(tree), workers=4)
+
+    assert result.startswith('Error') and 'broken' in result
+    copy = tmp_path / 'project_copy1'
+    assert (copy / 'src' / 'main.py').read_text() == 'print(1)\n'
+    assert (copy / 'src' / 'pkg' / 'data.bin').exists()
+    assert (copy / 'README.md').exists()
+
+
+def test_parallel_copy_reports_errors_raised_by_progress_callbacks(tmp_path, tree):
+    def fail(progress):
+        raise ValueError('progress display closed')
+
+    with pytest.raises(shutil.Error, match='progress display closed'):
+        copy_tree_parallel(str(tree), str(tmp_path / 'copy'), workers=2, progress=CopyProgress(fail))
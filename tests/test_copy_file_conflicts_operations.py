@@ -39,8 +39,8 @@ class TestFileManager(unittest.TestCase):
         result = self.file_manager.copy_file('testfile.txt', new_path, max_copies=2)
         self.assertEqual(result, 'File copied successfully.', "Should return success message")
 
-        # Test exceeding maximum number of copies
-        mock_exists.side_effect = lambda x: True
+        # Test exceeding maximum number of copies; free names are found from the cached listing
+        self.file_manager.files = ['testfile.txt', 'testfile_copy1.txt', 'testfile_copy2.txt']
         result = self.file_manager.copy_file('testfile.txt', new_path, max_copies=2)
         self.assertEqual(result, 'Error: Maximum number of copies (2) reached.', "Should return error message on exceeding max copies")
 
@@ -16,12 +16,21 @@ class TestFileManager(unittest.TestCase):
         response = self.fm.copy_file('existingfile.txt', '/invalid/path/newfile.txt')
         self.assertIn('Invalid or inaccessible path specified.', response)
 
-    @patch('src.FileManagementSystem.os.path.exists', MagicMock(side_effect=[True]*10 + [False]))
     @patch('src.FileManagementSystem.shutil.copy')
     @patch('src.FileManagementSystem.FileManager.is_valid_path', MagicMock(return_value=True))
     def test_max_copies_reached(self, mock_copy):
+        self.fm.files = ['existingfile.txt'] + [f'existingfile_copy{n}.txt' for n in range(1, 11)]
         response = self.fm.copy_file('existingfile.txt', '/fake/directory/existingfile.txt')
         self.assertIn('Error: Maximum number of copies (10) reached.', response)
 
+    @patch('src.FileManagementSystem.os.path.exists')
+    @patch('src.FileManagementSystem.shutil.copy')
+    @patch('src.FileManagementSystem.FileManager.is_valid_path', MagicMock(return_value=True))
+    def test_unbounded_copies_without_stat_calls(self, mock_copy, mock_exists):
+        self.fm.files = ['existingfile.txt'] + [f'existingfile_copy{n}.txt' for n in range(1, 501)]
+        response = self.fm.copy_file('existingfile.txt', '/fake/directory/existingfile.txt', max_copies=None, verbose=True)
+        self.assertIn('existingfile_copy501.txt', response)
+        mock_exists.assert_not_called()
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,43 @@
+import os
+from src.FileManagementSystem import FileManager, delta_copy
+
+BLOCK = 4096
+
+
+def test_delta_copy_writes_only_changed_blocks(tmp_path):
+    source, destination = tmp_path / 'disk.img', tmp_path / 'backup.img'
+    data = bytearray(os.urandom(BLOCK * 8 + 100))
+    destination.write_bytes(data + b'stale tail')
+    data[BLOCK * 5 + 7] ^= 0xFF
+    source.write_bytes(data)
+
+    stats = delta_copy(str(source), str(destination), block_size=BLOCK, workers=3)
+
+    assert destination.read_bytes() == source.read_bytes()
+    assert (stats.blocks_changed, stats.blocks_total, stats.bytes_written) == (1, 9, BLOCK)
+
+
+def test_copy_file_delta_updates_existing_copy_in_place(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'backup').mkdir()
+    (tmp_path / 'dump.sql').write_bytes(b'a' * BLOCK * 3)
+    fm = FileManager()
+    fm.copy_file('dump.sql', str(tmp_path / 'backup') + os.sep)
+    (tmp_path / 'dump.sql').write_bytes(b'a' * BLOCK * 2 + b'b' * BLOCK)
+
+    result = fm.copy_file('dump.sql', str(tmp_path / 'backup') + os.sep, delta=True, verbose=True)
+
+    assert '1 of 1 blocks changed' in result
+    assert (tmp_path / 'backup' / 'dump.sql').read_bytes() == (tmp_path / 'dump.sql').read_bytes()
+    assert os.listdir(tmp_path / 'backup') == ['dump.sql']
+
+
+def test_delta_copy_of_an_emptied_file_truncates_the_destination(tmp_path):
+    source, destination = tmp_path / 'log.txt', tmp_path / 'backup.txt'
+    source.write_bytes(b'')
+    destination.write_bytes(b'x' * BLOCK)
+
+    stats = delta_copy(str(source), str(destination), block_size=BLOCK)
+
+    assert (stats.bytes_written, stats.blocks_total) == (0, 0)
+    assert destination.read_bytes() == b''
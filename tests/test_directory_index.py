@@ -0,0 +1,81 @@
+import os
+from src.FileManagementSystem import FileManager
+
+
+def test_mutations_do_not_rescan(tmp_path, monkeypatch, mocker):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'existing.txt').write_text('')
+    fm = FileManager()
+    assert 'existing.txt' in fm.files
+
+    # After the initial build, create and delete should only touch the index
+    scandir = mocker.spy(os, 'scandir')
+    assert 'created successfully' in fm.create_file('new.txt')
+    assert 'deleted successfully' in fm.delete_file('existing.txt')
+    fm.refresh_files()
+
+    assert scandir.call_count == 0
+    assert 'new.txt' in fm.files
+    assert 'existing.txt' not in fm.files
+
+
+def test_refresh_picks_up_external_changes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    fm = FileManager()
+    assert fm.files == []
+
+    os.mkdir(tmp_path / 'external')
+    # Force a visible mtime change even on filesystems with coarse timestamps
+    stat = os.stat(tmp_path)
+    os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    fm.refresh_files()
+    assert fm.files == ['external']
+    assert fm.list_directories() == ['external']
+
+
+def test_files_behaves_like_a_list(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    fm = FileManager()
+    fm.files = ['a.txt', 'b.txt']
+
+    fm.files.append('c.txt')
+    fm.files.remove('a.txt')
+
+    assert fm.files == ['b.txt', 'c.txt']
+    assert 'b.txt' in fm.files and 'a.txt' not in fm.files
+    assert fm.files[-1] == 'c.txt'
+    assert len(fm.files) == 2
+
+
+def test_files_can_be_deleted_while_iterating(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for number in range(5):
+        (tmp_path / f'file{number}.txt').write_text('')
+    fm = FileManager()
+    _, listed = fm.list_files()
+
+    for name in fm.files:
+        assert 'deleted successfully' in fm.delete_file(name)
+    fm.create_file('new.txt')
+
+    assert os.listdir(tmp_path) == ['new.txt']
+    # The listing is a snapshot taken when list_files was called
+    assert len(listed) == 5
+
+
+def test_external_changes_survive_own_mutations(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    fm = FileManager()
+    (tmp_path / 'external.txt').write_text('')
+    # Force a visible mtime change even on filesystems with coarse timestamps
+    stat = os.stat(tmp_path)
+    os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert fm.list_files()[1] == ['external.txt']
+    (tmp_path / 'other.txt').write_text('')
+    os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10**9))
+    fm.create_file('mine.txt')
+    fm.refresh_files()
+
+    assert sorted(fm.files) == ['external.txt', 'mine.txt', 'other.txt']
@@ -0,0 +1,26 @@
+import os
+from src.FileManagementSystem import FileManager, DiskUsage
+
+
+def test_disk_usage_totals_and_largest(monkeypatch, tree):
+    monkeypatch.chdir(tree)
+    fm = FileManager()
+
+    report = fm.disk_usage(top=2)
+
+    assert (report.bytes, report.files, report.directories) == (4111, 3, 4)
+    assert [(os.path.basename(entry.path), entry.bytes) for entry in report.largest_files] == [('data.bin', 4096), ('main.py', 9)]
+    assert [(os.path.relpath(entry.path), entry.bytes, entry.files) for entry in report.largest_directories] == [
+        ('src', 4105, 2), (os.path.join('src', 'pkg'), 4096, 1)]
+
+
+def test_refresh_rescans_only_changed_directories(tmp_path, tree):
+    cache = str(tmp_path / 'usage.json')
+    DiskUsage(str(tree), cache).refresh()
+    (tree / 'empty' / 'more.txt').write_bytes(b'd' * 889)
+
+    usage = DiskUsage(str(tree), cache)
+    stats = usage.refresh()
+
+    assert (stats.directories_scanned, stats.directories_skipped) == (1, 3)
+    assert usage.report().bytes == 5000
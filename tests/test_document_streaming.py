@@ -0,0 +1,29 @@
+from src.FileManagementSystem import Document
+
+
+def test_iter_chunks_and_lines(tmp_path):
+    path = tmp_path / 'log.txt'
+    path.write_text('first\nsecond\nthird\n')
+    document = Document(str(path))
+
+    assert list(document.iter_chunks(chunk_size=5)) == ['first', '\nseco', 'nd\nth', 'ird\n']
+    assert list(document.iter_chunks(chunk_size=8, binary=True))[0] == b'first\nse'
+    assert list(document.iter_lines()) == ['first\n', 'second\n', 'third\n']
+
+
+def test_read_range_and_memory_map(tmp_path):
+    path = tmp_path / 'data.bin'
+    path.write_bytes(bytes(range(256)))
+    document = Document(str(path))
+
+    assert document.read_range(10, 4) == bytes([10, 11, 12, 13])
+    assert document.read_range(250, 100) == bytes(range(250, 256))
+    with document.memory_map() as view:
+        assert len(view) == 256
+        assert view[100:103].tobytes() == bytes([100, 101, 102])
+
+
+def test_streaming_missing_file_reports_error(tmp_path):
+    document = Document(str(tmp_path / 'missing.txt'))
+
+    assert document.iter_chunks() == 'Error: File or directory not found.'
@@ -0,0 +1,31 @@
+import os
+from src.FileManagementSystem import Document
+
+
+def test_write_modes(tmp_path):
+    path = tmp_path / 'out.txt'
+    document = Document(str(path))
+
+    assert 'successfully' in document.write_to_file('one\n')
+    assert 'successfully' in document.write_to_file(('line %d\n' % n for n in range(2)), append=True, fsync=4)
+    assert path.read_text() == 'one\nline 0\nline 1\n'
+
+    document.write_to_file([b'\x00', b'\x01'], append=True, atomic=True, fsync='close')
+    assert path.read_bytes() == b'one\nline 0\nline 1\n\x00\x01'
+    assert os.listdir(tmp_path) == ['out.txt']
+
+
+def test_atomic_write_keeps_old_content_on_failure(tmp_path):
+    path = tmp_path / 'out.txt'
+    path.write_text('original')
+    document = Document(str(path))
+
+    def chunks():
+        yield 'partial'
+        raise ValueError('generator failed')
+
+    result = document.write_to_file(chunks(), atomic=True)
+
+    assert result.startswith('Error:')
+    assert path.read_text() == 'original'
+    assert os.listdir(tmp_path) == ['out.txt']
@@ -0,0 +1,40 @@
+import os
+import pytest
+import src.FileManagementSystem as fms
+from src.FileManagementSystem import fast_copy
+
+
+def make_sparse_file(path):
+    with open(path, 'wb') as file:
+        file.write(b'head')
+        file.seek(4 * 1024 * 1024)
+        file.write(b'middle')
+        file.truncate(8 * 1024 * 1024)
+
+
+@pytest.mark.parametrize('method', fms.COPY_METHODS)
+def test_fast_copy_preserves_content(tmp_path, monkeypatch, method):
+    monkeypatch.setattr(fms, 'COPY_METHODS', (method, 'readinto'))
+    source, destination = tmp_path / 'source.img', tmp_path / 'destination.img'
+    make_sparse_file(source)
+
+    stats = fast_copy(str(source), str(destination), buffer_size=64 * 1024)
+
+    assert destination.read_bytes() == source.read_bytes()
+    assert stats.method == method
+    assert stats.bytes <= os.path.getsize(source)
+
+
+def test_fast_copy_falls_back_when_kernel_refuses(tmp_path, monkeypatch):
+    def refuse(*args):
+        raise OSError(fms.errno.EXDEV, 'Invalid cross-device link')
+
+    monkeypatch.setattr(fms.os, 'copy_file_range', refuse, raising=False)
+    monkeypatch.setattr(fms, 'COPY_METHODS', ('copy_file_range', 'readinto'))
+    source, destination = tmp_path / 'source.bin', tmp_path / 'destination.bin'
+    source.write_bytes(os.urandom(300 * 1024))
+
+    stats = fast_copy(str(source), str(destination), buffer_size=64 * 1024)
+
+    assert destination.read_bytes() == source.read_bytes()
+    assert stats.method == 'readinto'
@@ -9,9 +9,16 @@ from src.FileManagementSystem import FileManager
 # # Test for listing files
 
 def test_list_files(mocker):
-    # Set up the expected file list and mock os.listdir before FileManager instantiation
+    # Set up the expected file list and mock os.scandir before FileManager instantiation
     expected_files = ["file1.txt", "file2.txt", "file3.txt"]
-    mocker.patch('os.listdir', return_value=expected_files) # Mock os.listdir
+    entries = []
+    for name in expected_files:
+        entry = MagicMock()
+        entry.name = name
+        entry.is_dir.return_value = False
+        entries.append(entry)
+    scandir = mocker.patch('os.scandir') # Mock os.scandir
+    scandir.return_value.__enter__.return_value = iter(entries)
 
     # Now create the FileManager instance
     fm = FileManager()
@@ -117,7 +124,7 @@ def test_move_file(mocker):
     fm.files = [filename]
 
     # Setup mocks for the successful move
-    move_mock = mocker.patch('shutil.move')
+    move_mock = mocker.patch('src.FileManagementSystem.move_path')
     mocker.patch('os.path.exists', return_value=True)
     mocker.patch('os.path.isdir', return_value=True)
     mocker.patch('os.access', return_value=True)
@@ -0,0 +1,35 @@
+import os
+import pytest
+from src.FileManagementSystem import FileManager, find_duplicates
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_find_duplicates_stages(tmp_path, workers):
+    big = os.urandom(300 * 1024)
+    # Same size and same first and last blocks, different in the middle
+    changed = big[:150 * 1024] + bytes([big[150 * 1024] ^ 0xFF]) + big[150 * 1024 + 1:]
+    os.makedirs(tmp_path / 'backup')
+    (tmp_path / 'big.bin').write_bytes(big)
+    (tmp_path / 'backup' / 'big_copy1.bin').write_bytes(big)
+    (tmp_path / 'changed.bin').write_bytes(changed)
+    (tmp_path / 'a.txt').write_text('same')
+    (tmp_path / 'backup' / 'a_copy1.txt').write_text('same')
+    (tmp_path / 'b.txt').write_text('diff')
+    os.link(tmp_path / 'b.txt', tmp_path / 'b_link.txt')
+
+    report = find_duplicates(str(tmp_path), workers=workers)
+
+    groups = [[os.path.relpath(path, tmp_path) for path in group.paths] for group in report.groups]
+    assert groups == [['backup/big_copy1.bin', 'big.bin'], ['a.txt', 'backup/a_copy1.txt']]
+    assert report.reclaimable_bytes == len(big) + 4
+    assert report.files_scanned == 6
+    assert report.files_fully_hashed == 3
+
+
+def test_file_manager_find_duplicates(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'a.txt').write_text('same')
+    (tmp_path / 'a_copy1.txt').write_text('same')
+    fm = FileManager()
+
+    assert fm.find_duplicates(workers=1).reclaimable_bytes == 4
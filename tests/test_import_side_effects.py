@@ -0,0 +1,17 @@
+import sys
+import subprocess
+from src.FileManagementSystem import PROJECT_ROOT
+
+CHECK = '''
+import sys, logging
+sys.path.insert(0, {root!r})
+import src.FileManagementSystem
+assert 'readline' not in sys.modules, 'readline imported'
+assert not logging.getLogger().handlers, 'logging configured'
+'''
+
+
+def test_import_has_no_side_effects(tmp_path):
+    # Run from an unrelated directory: importing must not need the repo root as cwd or create logs there
+    subprocess.run([sys.executable, '-c', CHECK.format(root=PROJECT_ROOT)], cwd=tmp_path, check=True)
+    assert list(tmp_path.iterdir()) == []
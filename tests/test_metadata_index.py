@@ -0,0 +1,74 @@
+import os
+import time
+from src.MetadataIndex import MetadataIndex
+
+
+def bump_mtime(path):
+    # Force a visible mtime change even on filesystems with coarse timestamps
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def names(entries):
+    return sorted(os.path.basename(entry.path) for entry in entries)
+
+
+def test_refresh_and_queries(tmp_path):
+    os.makedirs(tmp_path / 'logs' / 'old')
+    (tmp_path / 'report.txt').write_text('x' * 10)
+    (tmp_path / 'logs' / 'app.log').write_text('x' * 1000)
+    (tmp_path / 'logs' / 'old' / 'app.log.1').write_text('x' * 5000)
+
+    with MetadataIndex(str(tmp_path)) as index:
+        stats = index.refresh(compute_hash=True)
+        assert stats.directories_scanned == 3
+        assert stats.entries_updated == 5
+
+        assert names(index.find_prefix('app')) == ['app.log', 'app.log.1']
+        assert names(index.find_glob('*.log*')) == ['app.log', 'app.log.1']
+        assert names(index.find_size(500, 2000)) == ['app.log']
+        assert names(index.modified_since(time.time() - 3600)) == ['app.log', 'app.log.1', 'logs', 'old', 'report.txt']
+        assert all(entry.hash for entry in index.find_size(1))
+
+
+def test_refresh_is_incremental_and_persistent(tmp_path):
+    database = str(tmp_path / 'index.sqlite3')
+    tmp_path = tmp_path / 'share'
+    os.makedirs(tmp_path / 'a' / 'b')
+    (tmp_path / 'a' / 'b' / 'keep.txt').write_text('')
+    with MetadataIndex(str(tmp_path), database) as index:
+        index.refresh()
+
+    os.remove(tmp_path / 'a' / 'b' / 'keep.txt')
+    (tmp_path / 'a' / 'b' / 'new.txt').write_text('')
+    bump_mtime(tmp_path / 'a' / 'b')
+
+    # A new connection sees the previous refresh and only rescans the changed directory
+    with MetadataIndex(str(tmp_path), database) as index:
+        stats = index.refresh()
+        assert (stats.directories_scanned, stats.directories_skipped, stats.entries_removed) == (1, 2, 1)
+        assert names(index.find_glob('*.txt')) == ['new.txt']
+
+
+def test_unreadable_directory_is_skipped(tmp_path, monkeypatch):
+    os.makedirs(tmp_path / 'private')
+    (tmp_path / 'private' / 'secret.txt').write_text('x')
+    (tmp_path / 'report.txt').write_text('x')
+    scandir = os.scandir
+
+    with MetadataIndex(str(tmp_path), str(tmp_path / 'index.sqlite3')) as index:
+        index.refresh()
+        bump_mtime(tmp_path / 'private')
+
+        def deny_private(path):
+            if os.path.basename(path) == 'private':
+                raise PermissionError(13, 'Permission denied', path)
+            return scandir(path)
+        monkeypatch.setattr(os, 'scandir', deny_private)
+        stats = index.refresh()
+        monkeypatch.undo()
+
+        assert stats.entries_removed == 0
+        assert names(index.find_glob('*.txt')) == ['report.txt', 'secret.txt']
+        # Once readable again the directory is re-listed
+        assert index.refresh().directories_scanned == 1
@@ -0,0 +1,72 @@
+import os
+import shutil
+import threading
+import pytest
+import src.FileManagementSystem as fms
+from src.FileManagementSystem import CopyCancelled, move_path
+
+
+@pytest.fixture
+def cross_device(monkeypatch):
+    """Make every rename fail as if source and destination were on different filesystems."""
+    def rename(source, destination):
+        raise OSError(fms.errno.EXDEV, 'Invalid cross-device link')
+    monkeypatch.setattr(fms.os, 'rename', rename)
+
+
+@pytest.fixture
+def target(tmp_path):
+    os.makedirs(tmp_path / 'target')
+    return tmp_path / 'target'
+
+
+def test_same_device_move_is_a_rename(tree, target):
+    stats = move_path(str(tree), str(target))
+    assert stats.method == 'rename'
+    assert (target / 'project' / 'src' / 'pkg' / 'data.bin').exists()
+
+
+def test_interrupted_cross_device_move_resumes(tree, target, cross_device):
+    destination = target / 'project'
+    expected = {name: (tree / name).read_bytes() for name in ('README.md', 'src/main.py', 'src/pkg/data.bin')}
+    cancel = threading.Event()
+    cancel.set()
+    with pytest.raises(CopyCancelled):
+        move_path(str(tree), str(target), cancel=cancel)
+    # One file made it across before the interruption
+    os.makedirs(destination, exist_ok=True)
+    shutil.copy2(tree / 'README.md', destination / 'README.md')
+
+    stats = move_path(str(tree), str(target), checksum=True)
+
+    assert (stats.method, stats.files_copied, stats.resumed) == ('copy', 2, True)
+    assert not tree.exists()
+    assert {name: (destination / name).read_bytes() for name in expected} == expected
+    assert os.listdir(target) == ['project']
+
+
+def test_cross_device_move_keeps_symlinks(tree, target, cross_device):
+    os.symlink('../main.py', tree / 'src' / 'pkg' / 'link.py')
+    os.symlink(str(target), tree / 'outside')
+
+    stats = move_path(str(tree), str(target))
+
+    destination = target / 'project'
+    assert (stats.method, stats.files_copied) == ('copy', 5)
+    assert os.readlink(destination / 'src' / 'pkg' / 'link.py') == '../main.py'
+    assert os.readlink(destination / 'outside') == str(target)
+    assert not tree.exists()
+
+
+def test_move_refuses_existing_destination(tree, target, cross_device):
+    (target / 'project').mkdir()
+    with pytest.raises(FileExistsError, match='Destination already exists'):
+        move_path(str(tree), str(target))
+
+
+def test_move_refuses_destination_of_another_move(tree, target, cross_device):
+    (target / '.project.fms-move').write_text('{"source": "/elsewhere/project", "destination": "%s"}\n'
+                                              % (target / 'project'))
+    with pytest.raises(FileExistsError, match='unfinished move of another source'):
+        move_path(str(tree), str(target))
+    assert (tree / 'README.md').exists()
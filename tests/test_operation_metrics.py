@@ -0,0 +1,42 @@
+import json
+from src.FileManagementSystem import FileManager, operation_metrics
+
+
+def test_operations_are_counted_with_bytes_and_errors(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'project').mkdir()
+    (tmp_path / 'project' / 'data.bin').write_bytes(b'x' * 1000)
+    operation_metrics.reset()
+    fm = FileManager()
+
+    fm.copy_directory('project', str(tmp_path / 'project'))
+    fm.copy_directory('project', str(tmp_path / 'project'), workers=2)
+    fm.delete_directory('missing')
+
+    snapshot = operation_metrics.snapshot()
+    copies = snapshot['FileManager.copy_directory']
+    assert (copies['count'], copies['errors'], copies['bytes']) == (2, 0, 2000)
+    assert 0 < copies['p50'] <= copies['p99'] <= copies['max']
+    assert snapshot['FileManager.delete_directory']['errors'] == 1
+
+    operation_metrics.dump(str(tmp_path / 'metrics.json'))
+    assert json.loads((tmp_path / 'metrics.json').read_text())['operations'] == snapshot
+
+
+def test_returned_failures_are_counted_as_errors(tmp_path, monkeypatch, mocker):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'gone.txt').write_text('')
+    operation_metrics.reset()
+    fm = FileManager()
+
+    fm.delete_file('missing.txt')
+    fm.move_file('gone.txt', str(tmp_path / 'nowhere'))
+    # The file disappears behind the index's back, so os.remove fails with ENOENT
+    mocker.patch('os.remove', side_effect=FileNotFoundError(2, 'No such file or directory'))
+    assert fm.delete_file('gone.txt').startswith('An error occurred')
+    mocker.stopall()
+    assert fm.delete_file('gone.txt') == 'File deleted successfully.'
+
+    snapshot = operation_metrics.snapshot()
+    assert (snapshot['FileManager.delete_file']['count'], snapshot['FileManager.delete_file']['errors']) == (3, 2)
+    assert snapshot['FileManager.move_file']['errors'] == 1
@@ -0,0 +1,63 @@
+import os
+import shutil
+import pytest
+from src.FileManagementSystem import FileManager, sync_tree
+
+
+def test_sync_copies_only_changes_and_deletes_extraneous(tmp_path, monkeypatch, tree):
+    monkeypatch.chdir(tmp_path)
+    fm = FileManager()
+
+    assert fm.sync_directory('project', 'mirror') == 'Directory synced successfully.'
+    assert (tmp_path / 'mirror' / 'src' / 'main.py').read_text() == 'print(1)\n'
+    assert 'mirror' in fm.files
+
+    (tree / 'src' / 'main.py').write_text('print(2)\n')
+    (tmp_path / 'mirror' / 'stale.txt').write_text('old')
+    stats = sync_tree(str(tree), str(tmp_path / 'mirror'), delete=True)
+
+    assert (stats.files_copied, stats.files_unchanged, stats.entries_deleted) == (1, 2, 1)
+    assert (tmp_path / 'mirror' / 'src' / 'main.py').read_text() == 'print(2)\n'
+    assert not (tmp_path / 'mirror' / 'stale.txt').exists()
+
+
+def test_sync_checksum_catches_same_size_and_mtime(tmp_path, tree):
+    sync_tree(str(tree), str(tmp_path / 'mirror'))
+    copy = tmp_path / 'mirror' / 'README.md'
+    stat = copy.stat()
+    copy.write_text('README')
+    os.utime(copy, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    assert sync_tree(str(tree), str(tmp_path / 'mirror')).files_copied == 0
+    assert sync_tree(str(tree), str(tmp_path / 'mirror'), checksum=True).files_copied == 1
+    assert copy.read_text() == 'readme'
+
+
+def test_sync_copies_symlinks_as_links(tmp_path, monkeypatch, tree):
+    monkeypatch.chdir(tmp_path)
+    os.symlink('..', tree / 'src' / 'loop')
+    os.symlink('main.py', tree / 'src' / 'link.py')
+    fm = FileManager()
+
+    assert fm.sync_directory('project', 'mirror') == 'Directory synced successfully.'
+    assert os.readlink(tmp_path / 'mirror' / 'src' / 'loop') == '..'
+    assert os.readlink(tmp_path / 'mirror' / 'src' / 'link.py') == 'main.py'
+    stats = sync_tree(str(tree), str(tmp_path / 'mirror'), symlinks=True)
+    assert (stats.files_copied, stats.files_unchanged) == (0, 5)
+
+
+def test_sync_following_symlinks_skips_cycles(tmp_path, tree):
+    os.symlink('..', tree / 'src' / 'loop')
+
+    sync_tree(str(tree), str(tmp_path / 'mirror'))
+
+    assert (tmp_path / 'mirror' / 'src' / 'main.py').read_text() == 'print(1)\n'
+    assert not (tmp_path / 'mirror' / 'src' / 'loop').exists()
+
+
+def test_sync_reports_any_error_raised_by_the_copy_function(tmp_path, tree):
+    def broken_copy(source, destination):
+        raise ValueError('broken copy function')
+
+    with pytest.raises(shutil.Error, match='broken copy function'):
+        sync_tree(str(tree), str(tmp_path / 'mirror'), copy_function=broken_copy)
@@ -0,0 +1,103 @@
+import os
+import sys
+import time
+import threading
+import subprocess
+import pytest
+from src.FileManagementSystem import FileManager, Trash
+
+
+def test_fast_delete_can_be_restored_before_purge(tmp_path, monkeypatch, tree):
+    monkeypatch.chdir(tmp_path)
+    fm = FileManager()
+    fm.trash = Trash(delay=60, root=str(tmp_path / 'trash'))
+
+    assert fm.delete_directory('project', fast=True) == 'Directory deleted successfully.'
+    assert not tree.exists()
+    assert 'project' not in fm.files
+
+    assert fm.restore_directory('project') == 'Directory restored successfully.'
+    assert (tree / 'src' / 'main.py').read_text() == 'print(1)\n'
+    assert os.listdir(tmp_path / 'trash') == []
+
+
+def test_purge_empties_trash_and_recovers_leftovers(tmp_path, tree):
+    area = str(tmp_path / 'trash')
+    Trash(delay=60, root=area).delete(str(tree))
+
+    # A new process finds the tree left behind by the previous one
+    trash = Trash(workers=4, delay=60, root=area)
+    trash.area(str(tree))
+    trash.empty()
+
+    assert os.listdir(area) == []
+    with pytest.raises(FileNotFoundError):
+        trash.restore(str(tree))
+
+
+def test_waiting_purges_share_one_scheduler_thread(tmp_path):
+    for number in range(50):
+        os.makedirs(tmp_path / f'dir{number}' / 'sub')
+    trash = Trash(delay=60, root=str(tmp_path / 'trash'))
+    threads = threading.active_count()
+
+    for number in range(50):
+        trash.delete(str(tmp_path / f'dir{number}'))
+
+    assert threading.active_count() == threads + 1
+    trash.empty()
+    assert os.listdir(tmp_path / 'trash') == []
+
+
+def test_waiting_trees_are_left_for_the_next_process(tmp_path, tree):
+    area = str(tmp_path / 'trash')
+    script = f'from src.FileManagementSystem import Trash; Trash(delay=60, root={area!r}).delete({str(tree)!r})'
+    subprocess.run([sys.executable, '-c', script], check=True, cwd=os.path.dirname(os.path.dirname(__file__)))
+
+    assert not tree.exists()
+    assert len(os.listdir(area)) == 1
+
+    trash = Trash(delay=60, root=area)
+    trash.recover(str(tree))
+    trash.empty()
+    assert os.listdir(area) == []
+
+
+def test_file_manager_recovers_the_trash_only_when_asked(mocker):
+    recover = mocker.patch.object(Trash, 'recover')
+
+    FileManager()
+    recover.assert_not_called()
+    FileManager(recover_trash=True)
+    recover.assert_called_once()
+
+
+def test_recover_purges_leftovers_once_their_delay_has_passed(tmp_path, tree):
+    area = str(tmp_path / 'trash')
+    entry = Trash(delay=60, root=area).delete(str(tree))
+    # A process that crashed before the purge, long enough ago for the delay to have passed
+    with open(os.path.join(entry.path, 'info.json'), 'w') as file:
+        file.write('{"original": "%s", "deleted": %f}' % (entry.original, entry.deleted - 120))
+
+    Trash(delay=60, root=area).recover(str(tree))
+
+    for _ in range(500):
+        if not os.listdir(area):
+            break
+        time.sleep(0.01)
+    assert os.listdir(area) == []
+
+
+def test_trash_area_is_hidden_from_listings(tmp_path, monkeypatch, tree):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'other').mkdir()
+    fm = FileManager()
+    # As when the volume root is not writable and the trash goes in the deleted directory's parent
+    fm.trash = Trash(delay=60, root=str(tmp_path / '.fms-trash'))
+    fm.delete_directory('project', fast=True)
+    fm.refresh_files()
+
+    assert fm.list_files()[1] == ['other']
+    assert [entry.name for entry in fm.walk()] == ['other']
+    assert fm.disk_usage().files == 0
+    fm.trash.empty()
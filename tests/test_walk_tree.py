@@ -0,0 +1,42 @@
+import os
+import pytest
+from src.FileManagementSystem import FileManager, walk_tree
+
+
+@pytest.fixture
+def walk_root(tmp_path):
+    os.makedirs(tmp_path / 'a' / 'b' / 'c')
+    os.makedirs(tmp_path / 'node_modules' / 'pkg')
+    (tmp_path / 'top.txt').write_text('')
+    (tmp_path / 'a' / 'one.py').write_text('')
+    (tmp_path / 'a' / 'b' / 'two.py').write_text('')
+    (tmp_path / 'a' / 'b' / 'c' / 'three.txt').write_text('')
+    return tmp_path
+
+
+def relative(root, entries):
+    return sorted(os.path.relpath(entry.path, root) for entry in entries)
+
+
+@pytest.mark.parametrize('workers', [None, 4])
+def test_walk_tree_filters_and_depth(walk_root, workers):
+    assert relative(walk_root, walk_tree(str(walk_root), include=['*.py'], workers=workers)) == ['a/b/two.py', 'a/one.py']
+    assert relative(walk_root, walk_tree(str(walk_root), max_depth=2, exclude=['node_modules'], workers=workers)) == [
+        'a', 'a/b', 'a/one.py', 'top.txt']
+
+
+def test_walk_tree_symlink_policy(walk_root):
+    os.symlink(walk_root / 'a', walk_root / 'link')
+
+    assert 'link/one.py' not in relative(walk_root, walk_tree(str(walk_root)))
+    followed = relative(walk_root, walk_tree(str(walk_root), follow_symlinks=True))
+    # The target is only walked once, through whichever path reaches it first
+    assert followed.count('a/one.py') + followed.count('link/one.py') == 1
+
+
+def test_list_directories_recursive(walk_root, monkeypatch):
+    monkeypatch.chdir(walk_root)
+    fm = FileManager()
+
+    assert sorted(fm.list_directories(recursive=True)) == ['a', 'a/b', 'a/b/c', 'node_modules', 'node_modules/pkg']
+    assert sorted(fm.list_directories()) == ['a', 'node_modules']